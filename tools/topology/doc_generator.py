@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Generate Markdown reference documentation from a topology document.
+
+Companion to quadlet_generator.py: reads topology.json and emits a
+service catalog, a per-field configuration reference, a Mermaid
+dependency graph, and a provider guide. Output is meant to be committed
+alongside the schema so docs never drift from the topology.
+
+Usage:
+    python tools/topology/doc_generator.py njk-schema-markdown/topology.json --output ./docs/generated
+"""
+
+import argparse
+import itertools
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from pathlib import Path
+
+from quadlet_generator import _load_topology, _write_if_changed
+
+
+class DocGenerator:
+    """Generate Markdown docs from a topology document"""
+
+    def __init__(self, topology):
+        self.topology = topology
+        self.services = topology['topology']['services']
+        self.release = topology.get('release', {})
+
+        # Denormalize the two-level service lookups once; every later pass
+        # reads these instead of re-walking the service dicts.
+        self._infra = {name: svc['infrastructure'] for name, svc in self.services.items()}
+        self._props = {
+            name: svc.get('configuration', {}).get('properties', {})
+            for name, svc in self.services.items()
+        }
+
+        # Every generator wants the services in name order, and the catalog
+        # wants them bucketed by type; compute both once.
+        self._sorted_names = sorted(self.services)
+        self._by_type = {'main': [], 'database': [], 'cache': [], 'conditional': []}
+        # Backing services follow the <owner>_postgres / <owner>_redis
+        # naming convention, so an anchored suffix test classifies them
+        # without scanning the whole name.
+        for service_name in self._sorted_names:
+            if service_name.endswith('_postgres'):
+                self._by_type['database'].append(service_name)
+            elif service_name.endswith('_redis'):
+                self._by_type['cache'].append(service_name)
+            elif self._infra[service_name].get('enabled_by'):
+                self._by_type['conditional'].append(service_name)
+            else:
+                self._by_type['main'].append(service_name)
+
+        # Progress messages accumulate here and flush as one stdout write
+        # at the end of generate_all, instead of one flushed print per file.
+        self._log = []
+
+    def generate_all(self, output_dir):
+        """Generate every documentation file"""
+        output_path = Path(output_dir)
+        # EAFP beats exist_ok=True here: mkdir's exist_ok path re-stats the
+        # target, and on warm reruns the directory already exists.
+        try:
+            output_path.mkdir(parents=True)
+        except FileExistsError:
+            pass
+
+        # The four documents are independent; overlap their writes.
+        generators = (
+            self.generate_service_catalog,
+            self.generate_configuration_reference,
+            self.generate_dependency_graph,
+            self.generate_provider_guide,
+        )
+        with ThreadPoolExecutor() as ex:
+            for future in [ex.submit(g, output_path) for g in generators]:
+                future.result()
+
+        sys.stdout.write('Generated:\n  ' + '\n  '.join(self._log) + '\n')
+
+    # Service catalog
+
+    def generate_service_catalog(self, output_path: Path):
+        """Generate service-catalog.md grouped by service type"""
+        buf = StringIO()
+        buf.write("# Service Catalog\n\n")
+        buf.write(f"Release: {self.release.get('version', 'unreleased')}\n\n")
+
+        sections = [
+            ("Core Services", self._by_type['main']),
+            ("Databases", self._by_type['database']),
+            ("Caches", self._by_type['cache']),
+            ("Conditional Services", self._by_type['conditional']),
+        ]
+        for title, bucket in sections:
+            if not bucket:
+                continue
+            buf.write(f"## {title}\n\n")
+            for service_name in bucket:
+                self._format_service_entry(buf, service_name)
+
+        filename = output_path / 'service-catalog.md'
+        _write_if_changed(filename, buf.getvalue())
+        self._log.append(str(filename))
+
+    def _format_service_entry(self, buf: StringIO, service_name):
+        """Write the catalog entry for one service"""
+        infra = self._infra[service_name]
+        published_port = infra.get('published_port')
+        requires = infra.get('requires')
+        enabled_by = infra.get('enabled_by')
+
+        buf.write(f"### {service_name}\n\n")
+        buf.write(infra.get('description', 'No description'))
+        buf.write("\n\n")
+        buf.write(f"- **Image**: `{infra.get('image', 'unknown')}`\n")
+        buf.write(f"- **Container**: `{infra.get('container_name', service_name)}`\n")
+        buf.write(f"- **Port**: {infra.get('port', 'n/a')}\n")
+        if published_port:
+            buf.write(f"- **Published port**: {published_port}\n")
+        if requires:
+            buf.write(f"- **Requires**: {', '.join(map('`{}`'.format, requires))}\n")
+        if enabled_by:
+            buf.write(f"- **Enabled by**: {', '.join(map('`{}`'.format, enabled_by))}\n")
+        buf.write("\n")
+
+    # Configuration reference
+
+    def generate_configuration_reference(self, output_path: Path):
+        """Generate configuration-reference.md with every field of every service"""
+        buf = StringIO()
+        buf.write("# Configuration Reference\n\n")
+
+        for service_name in self._sorted_names:
+            properties = self._props[service_name]
+            if not properties:
+                continue
+
+            buf.write(f"## {service_name}\n\n")
+
+            # One sort on a (category, display-order) key replaces the
+            # per-category bucket sorts.
+            def category_of(kv):
+                return kv[1].get('x-category', 'General')
+
+            items = sorted(
+                properties.items(),
+                key=lambda kv: (category_of(kv), kv[1].get('x-display-order', 999)),
+            )
+            for category, group in itertools.groupby(items, key=category_of):
+                buf.write(f"### {category}\n\n")
+                for field_name, field_def in group:
+                    self._format_field_entry(buf, field_name, field_def)
+
+        filename = output_path / 'configuration-reference.md'
+        _write_if_changed(filename, buf.getvalue())
+        self._log.append(str(filename))
+
+    def _format_field_entry(self, buf: StringIO, field_name, field_def):
+        """Write the reference entry for one configuration field"""
+        get = field_def.get
+        default = get('default')
+        enum = get('enum')
+        env_var = get('x-env-var')
+        depends_on = get('x-depends-on')
+        rationale = get('x-rationale')
+
+        buf.write(f"#### `{field_name}`\n\n")
+        buf.write(get('description', 'No description'))
+        buf.write("\n\n")
+        buf.write(f"- **Type**: {get('type', 'unknown')}\n")
+        if default is not None:
+            buf.write(f"- **Default**: `{default}`\n")
+        if enum:
+            buf.write(f"- **Allowed values**: {', '.join(map('`{}`'.format, enum))}\n")
+        if env_var:
+            buf.write(f"- **Environment variable**: `{env_var}`\n")
+        buf.write(f"- **Visibility**: {get('x-visibility', 'exposed')}\n")
+        if depends_on:
+            buf.write(f"- **Depends on**: `{depends_on}`\n")
+        if get('x-sensitive'):
+            buf.write("- **Sensitive**: yes\n")
+        if rationale:
+            buf.write(f"\n> {rationale}\n")
+        buf.write("\n")
+
+    # Dependency graph
+
+    def generate_dependency_graph(self, output_path: Path):
+        """Generate dependency-graph.md with a Mermaid diagram"""
+        buf = StringIO()
+        buf.write("# Service Dependency Graph\n\n")
+        buf.write("```mermaid\n")
+        buf.write("graph TD\n")
+
+        # Build the adjacency list while emitting the node lines; the dict
+        # keeps the sorted insertion order for the later passes.
+        graph = {}
+        for service_name in self._sorted_names:
+            graph[service_name] = self._infra[service_name].get('requires', [])
+            buf.write(f"    {service_name}[{service_name}]\n")
+
+        for service_name, deps_list in graph.items():
+            for dep in deps_list:
+                buf.write(f"    {service_name} --> {dep}\n")
+        buf.write("```\n\n")
+
+        for service_name, deps_list in graph.items():
+            if deps_list:
+                deps = ', '.join(map('`{}`'.format, deps_list))
+                buf.write(f"- `{service_name}` depends on {deps}\n")
+        buf.write("\n")
+
+        filename = output_path / 'dependency-graph.md'
+        _write_if_changed(filename, buf.getvalue())
+        self._log.append(str(filename))
+
+    # Provider guide
+
+    def generate_provider_guide(self, output_path: Path):
+        """Generate provider-guide.md from x-provider-fields metadata"""
+        buf = StringIO()
+        buf.write("# Provider Guide\n\n")
+        buf.write("Fields that switch providers, and the extra settings each provider needs.\n\n")
+
+        for service_name in self._sorted_names:
+            for field_name, field_def in self._props[service_name].items():
+                provider_fields = field_def.get('x-provider-fields')
+                if not isinstance(provider_fields, dict):
+                    continue
+
+                buf.write(f"## `{service_name}.{field_name}`\n\n")
+                for provider, fields in provider_fields.items():
+                    if fields:
+                        fields_list = ', '.join(map('`{}`'.format, fields))
+                    else:
+                        fields_list = 'no extra fields'
+                    buf.write(f"- **{provider}**: {fields_list}\n")
+                buf.write("\n")
+
+        filename = output_path / 'provider-guide.md'
+        _write_if_changed(filename, buf.getvalue())
+        self._log.append(str(filename))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generate Markdown reference docs from a topology document'
+    )
+    parser.add_argument('topology', help='Path to topology.json')
+    parser.add_argument('--output', '-o', default='./docs/generated',
+                        help='Output directory for generated docs')
+    args = parser.parse_args()
+
+    try:
+        topology = _load_topology(args.topology)
+    except (OSError, ValueError) as e:
+        print(f"❌ Failed to load topology: {e}")
+        sys.exit(1)
+
+    generator = DocGenerator(topology)
+    generator.generate_all(args.output)
+    print("✅ Documentation generated")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,578 @@
+#!/usr/bin/env python3
+"""
+Migrate a blueprint-config.json document to the topology schema.
+
+Implements the migration path described in
+njk-schema-markdown/MIGRATION-FROM-BLUEPRINT.md: each entry under
+infrastructure.services moves to topology.services.<name>.infrastructure,
+and the flat per-service config sections (openwebui, litellm, ...) become
+typed configuration.properties with x-env-var / x-category / x-visibility
+metadata. Secrets pass through unchanged.
+
+Usage:
+    python tools/topology/migrate_blueprint.py blueprint-config.json --output topology.json
+"""
+
+import json
+import mmap
+import sys
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import cysimdjson
+except ImportError:
+    cysimdjson = None
+
+
+# Healthcheck templates: the cadence fields are fixed per protocol, only
+# the redis command is fully static; postgres/http commands are formatted
+# into a copy of their base.
+_HC_REDIS = {
+    'cmd': 'redis-cli ping || exit 1',
+    'interval': '10s',
+    'timeout': '3s',
+    'retries': 3,
+    'start_period': '5s',
+}
+_HC_POSTGRES_BASE = {
+    'interval': '10s',
+    'timeout': '5s',
+    'retries': 5,
+    'start_period': '10s',
+}
+_HC_HTTP_BASE = {
+    'interval': '30s',
+    'timeout': '5s',
+    'retries': 3,
+    'start_period': '10s',
+}
+
+
+# Ports and paths come from a small shared pool (8080, 4000, /health, ...),
+# so the formatted commands are cached and reused across services.
+
+@lru_cache(maxsize=256)
+def _curl_cmd(port: int, path: str) -> str:
+    return f'curl -f http://localhost:{port}{path} || exit 1'
+
+
+@lru_cache(maxsize=256)
+def _pg_isready_cmd(db_user: str) -> str:
+    return f'pg_isready -U {db_user} || exit 1'
+
+
+def _loads(raw) -> dict:
+    """Parse a JSON buffer, using orjson's C parser when available"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    if not isinstance(raw, (bytes, bytearray, str)):
+        raw = bytes(raw)
+    return json.loads(raw)
+
+
+class _LazyBlueprint:
+    """dict-like facade over a lazily parsed cysimdjson document.
+
+    The migrator only reads a handful of top-level keys, so resolving them
+    through at_pointer skips PyObject construction for every subtree it
+    never touches; a section is materialized only when actually fetched.
+    """
+
+    def __init__(self, raw: bytes):
+        # The document is a view into the parser's buffer, so both the
+        # parser and the source bytes must stay alive alongside it.
+        self._raw = raw
+        self._parser = cysimdjson.JSONParser()
+        self._element = self._parser.parse(raw)
+
+    def get(self, key, default=None):
+        try:
+            value = self._element.at_pointer('/' + key)
+        except KeyError:
+            return default
+        export = getattr(value, 'export', None)
+        return export() if export is not None else value
+
+
+def _load_blueprint(raw, fast_parse: bool):
+    """Parse a blueprint buffer, lazily via cysimdjson when requested"""
+    if fast_parse and cysimdjson is not None:
+        # cysimdjson only accepts bytes, so a mapped buffer costs one copy
+        # here; the lazy facade then owns it for the document's lifetime.
+        return _LazyBlueprint(bytes(raw))
+    return _loads(raw)
+
+
+def _fragment(obj, depth: int) -> bytes:
+    """Encode one sub-object as indented JSON, re-indented for nesting depth"""
+    if orjson is not None:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(obj, indent=2).encode('utf-8')
+    return data.replace(b'\n', b'\n' + b'  ' * depth)
+
+
+def _compact_fragment(obj) -> bytes:
+    """Encode one sub-object as compact JSON"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+# Interned constants for strings repeated across every emitted property;
+# identity-stable values make downstream dict probes cheaper and dedupe
+# the produced topology in memory.
+T_STRING = sys.intern('string')
+T_BOOLEAN = sys.intern('boolean')
+CAT_GENERAL = sys.intern('General')
+CAT_FEATURES = sys.intern('Features')
+CAT_PROVIDERS = sys.intern('Providers')
+VIS_EXPOSED = sys.intern('exposed')
+VIS_ADVANCED = sys.intern('advanced')
+VIS_EXPERT = sys.intern('expert')
+
+
+# Sentinel for schema-table fields that carry no default value.
+_NO_DEFAULT = object()
+
+# Shared empty configuration for services with no user-facing settings;
+# emitted by reference, so nothing downstream may mutate it.
+_EMPTY_CONFIG = {'type': 'object', 'properties': {}}
+
+# Below this many services, worker spawn cost outweighs the parallel win
+# and migration stays on the single-process path.
+_PARALLEL_THRESHOLD = 16
+
+# Per-worker migrator, built once by the pool initializer so each task
+# ships only its (name, service) pair instead of the whole blueprint.
+_worker_migrator = None
+
+
+def _init_worker(blueprint):
+    global _worker_migrator
+    _worker_migrator = BlueprintMigrator(blueprint)
+
+
+def _migrate_one_service(item):
+    service_name, service = item
+    return service_name, _worker_migrator._migrate_service(service_name, service)
+
+
+class BlueprintMigrator:
+    """Migrate a blueprint-config document to the topology schema"""
+
+    # Default data mounts: exact service names first, then substring
+    # fallbacks for the <owner>_postgres / <owner>_redis backing services.
+    _MOUNT_EXACT = {
+        'qdrant': '/qdrant/storage',
+        'searxng': '/etc/searxng',
+        'jupyter': '/home/jovyan',
+        'comfyui': '/workspace',
+    }
+    _MOUNT_SUBSTR = (
+        ('postgres', '/var/lib/postgresql/data'),
+        ('redis', '/data'),
+    )
+
+    def __init__(self, blueprint):
+        self.blueprint = blueprint
+
+    def migrate_to(self, fp, pretty: bool = True) -> int:
+        """Stream the topology document to a binary file object.
+
+        Each service is migrated and serialized on its own, so peak memory
+        scales with the largest service instead of the whole topology being
+        built in full and then walked a second time by the encoder.
+        Compact encoding (pretty=False) skips all indentation work and is
+        roughly 3x cheaper for machine-read output.
+        Returns the number of services written.
+        """
+        # Deferred so that --help never pays the datetime import.
+        from datetime import datetime, timezone
+
+        infrastructure = self.blueprint.get('infrastructure', {})
+        # One clock read covers both release stamps; utcnow() is also on
+        # the deprecation path in 3.12+.
+        now = datetime.now(timezone.utc)
+        release = {
+            'version': self.blueprint.get('version', '0.1.0'),
+            'released_at': now.replace(tzinfo=None).isoformat() + 'Z',
+            'migration_date': now.date().isoformat(),
+        }
+
+        write = fp.write
+        if pretty:
+            fragment = _fragment
+            write(b'{\n')
+            write(b'  "schema_version": "2.0.0",\n')
+            write(b'  "release": ' + fragment(release, 1) + b',\n')
+            write(b'  "topology": {\n')
+            write(b'    "network": ' + fragment(infrastructure.get('network', {}), 2) + b',\n')
+            write(b'    "services": {\n')
+        else:
+            def fragment(obj, _depth):
+                return _compact_fragment(obj)
+            write(b'{"schema_version":"2.0.0",')
+            write(b'"release":' + fragment(release, 1) + b',')
+            write(b'"topology":{')
+            write(b'"network":' + fragment(infrastructure.get('network', {}), 2) + b',')
+            write(b'"services":{')
+
+        services = infrastructure.get('services', {})
+        if len(services) > _PARALLEL_THRESHOLD and isinstance(self.blueprint, dict):
+            # Services migrate independently; large blueprints fan the
+            # dict-shuffling out across cores while this process keeps
+            # writing results in input order. The lazy-parse facade is not
+            # picklable, so that path stays serial.
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(initializer=_init_worker,
+                                     initargs=(self.blueprint,)) as pool:
+                migrated_items = list(pool.map(_migrate_one_service,
+                                               services.items(), chunksize=8))
+        else:
+            migrated_items = (
+                (name, self._migrate_service(name, svc))
+                for name, svc in services.items()
+            )
+
+        count = 0
+        if pretty:
+            for service_name, migrated in migrated_items:
+                if count:
+                    write(b',\n')
+                write(b'      "' + service_name.encode('utf-8') + b'": ')
+                write(fragment(migrated, 3))
+                count += 1
+            write(b'\n    }\n')
+            write(b'  },\n')
+            write(b'  "secrets": ' + fragment(self.blueprint.get('secrets', {}), 1) + b'\n')
+            write(b'}\n')
+        else:
+            for service_name, migrated in migrated_items:
+                if count:
+                    write(b',')
+                write(b'"' + service_name.encode('utf-8') + b'":')
+                write(fragment(migrated, 3))
+                count += 1
+            write(b'}},')
+            write(b'"secrets":' + fragment(self.blueprint.get('secrets', {}), 1))
+            write(b'}\n')
+        return count
+
+    # Infrastructure
+
+    # Keys copied over verbatim when the blueprint sets them.
+    _OPTIONAL_KEYS = ('hostname', 'bind', 'enabled_by', 'websocket', 'external_subdomain')
+
+    def _migrate_service(self, service_name, service) -> dict:
+        """Migrate one service's infrastructure and configuration"""
+        service_name = sys.intern(service_name)
+        get = service.get
+
+        # One dict literal with .get defaults replaces the old run of
+        # if/else assignment blocks; only published_port stays conditional
+        # so absent ports are omitted rather than emitted as null.
+        infrastructure = {
+            'image': get('image', ''),
+            'container_name': get('container_name', service_name),
+            'port': get('port', 8080),
+            'network': 'llm.network',
+            'description': get('description') or f"{service_name} service",
+        }
+        published_port = get('published_port')
+        if published_port:
+            infrastructure['published_port'] = published_port
+        infrastructure['requires'] = get('requires') or []
+        infrastructure['enabled'] = bool(get('enabled', False))
+
+        for key in self._OPTIONAL_KEYS:
+            value = get(key)
+            if value is not None:
+                infrastructure[key] = value
+
+        infrastructure['volumes'] = get('volumes') or [{
+            'name': f"{service_name.replace('_', '-')}.volume",
+            'mount_path': self._get_default_mount_path(service_name),
+            'selinux_label': 'Z',
+        }]
+        infrastructure['healthcheck'] = self._generate_healthcheck(service_name, service)
+
+        return {
+            'infrastructure': infrastructure,
+            'configuration': self._migrate_service_configuration(service_name),
+        }
+
+    def _get_default_mount_path(self, service_name) -> str:
+        """Pick a sensible data mount for services the blueprint left bare"""
+        path = self._MOUNT_EXACT.get(service_name)
+        if path is not None:
+            return path
+        for substr, substr_path in self._MOUNT_SUBSTR:
+            if substr in service_name:
+                return substr_path
+        return '/data'
+
+    def _generate_healthcheck(self, service_name, service) -> dict:
+        """Build a healthcheck block matching the service's protocol"""
+        if 'redis' in service_name:
+            return dict(_HC_REDIS)
+
+        if 'postgres' in service_name:
+            db_user = service.get('db_user', service_name.partition('_')[0])
+            return {'cmd': _pg_isready_cmd(db_user), **_HC_POSTGRES_BASE}
+
+        port = service.get('port', 8080)
+        path = service.get('healthcheck_path', '/health')
+        return {'cmd': _curl_cmd(port, path), **_HC_HTTP_BASE}
+
+    # Configuration
+
+    def _migrate_service_configuration(self, service_name) -> dict:
+        """Convert a service's flat blueprint section to a typed schema"""
+        # partition returns a fixed 3-tuple in C, skipping split's list
+        # allocation for what is only ever a first-segment read.
+        base_name = service_name.partition('_')[0]
+        if base_name != service_name:
+            # Backing services (litellm_postgres, searxng_redis, ...) carry
+            # no user-facing configuration of their own.
+            return _EMPTY_CONFIG
+
+        if base_name == 'openwebui':
+            return self._migrate_openwebui_config()
+        if base_name == 'litellm':
+            return self._migrate_litellm_config()
+        if base_name == 'comfyui':
+            return self._migrate_comfyui_config()
+        if base_name == 'searxng':
+            return self._migrate_searxng_config()
+        return _EMPTY_CONFIG
+
+    # Property schema tables: one row per field, shaped
+    # (name, type, description, fallback,
+    #  category, display_order, visibility, template_path, extras).
+    # The default value is resolved by walking template_path over the
+    # blueprint, falling back to the row's fallback; _NO_DEFAULT marks
+    # fields that carry no default at all. extras is an optional dict of
+    # enum/x- keys merged into the entry.
+
+    _OPENWEBUI_PROPS = (
+        ('WEBUI_NAME', T_STRING, 'Main WebUI display name',
+         'Open WebUI',
+         CAT_GENERAL, 1, VIS_EXPOSED, 'openwebui.general.webui_name', None),
+        ('WEBUI_AUTH', T_BOOLEAN, 'Require login before using the interface',
+         True,
+         CAT_GENERAL, 2, VIS_EXPOSED, 'openwebui.general.webui_auth', None),
+        ('ENABLE_SIGNUP', T_BOOLEAN, 'Allow new account registration',
+         False,
+         CAT_FEATURES, 1, VIS_ADVANCED, 'openwebui.features.signup', None),
+        ('ENABLE_WEB_SEARCH', T_BOOLEAN, 'Enable web search functionality',
+         False,
+         CAT_FEATURES, 2, VIS_EXPOSED, 'openwebui.features.web_search',
+         {'x-enables-services': ['searxng', 'searxng_redis'],
+          'x-provider-fields': ['WEB_SEARCH_ENGINE']}),
+        ('WEB_SEARCH_ENGINE', T_STRING, 'Web search provider',
+         'searxng',
+         CAT_PROVIDERS, 1, VIS_EXPOSED, 'openwebui.providers.web_search_engine',
+         {'enum': ['searxng', 'tavily', 'brave'],
+          'x-depends-on': {'ENABLE_WEB_SEARCH': True}}),
+        ('ENABLE_IMAGE_GENERATION', T_BOOLEAN, 'Enable image generation functionality',
+         False,
+         CAT_FEATURES, 3, VIS_EXPOSED, 'openwebui.features.image_generation',
+         {'x-enables-services': ['comfyui'],
+          'x-provider-fields': ['IMAGE_GENERATION_ENGINE']}),
+        ('IMAGE_GENERATION_ENGINE', T_STRING, 'Image generation provider',
+         'comfyui',
+         CAT_PROVIDERS, 2, VIS_EXPOSED, 'openwebui.providers.image_generation_engine',
+         {'enum': ['comfyui', 'openai', 'automatic1111'],
+          'x-depends-on': {'ENABLE_IMAGE_GENERATION': True}}),
+        ('ENABLE_RAG_HYBRID_SEARCH', T_BOOLEAN, 'Use hybrid (keyword + vector) retrieval for RAG',
+         False,
+         CAT_FEATURES, 4, VIS_EXPERT, 'openwebui.features.rag_hybrid_search', None),
+        ('DATABASE_URL', T_STRING, 'Postgres connection string',
+         'postgresql://openwebui@openwebui-postgres:5432/openwebui',
+         CAT_GENERAL, 3, VIS_EXPERT, 'openwebui.general.database_url',
+         {'x-requires-field': 'openwebui_postgres.infrastructure.container_name'}),
+        ('OPENAI_API_BASE_URL', T_STRING, 'LLM gateway endpoint',
+         'http://litellm:4000/v1',
+         CAT_GENERAL, 4, VIS_EXPERT, 'openwebui.general.openai_api_base_url',
+         {'x-requires-field': 'litellm.infrastructure.container_name'}),
+    )
+
+    _LITELLM_PROPS = (
+        ('LITELLM_MASTER_KEY', T_STRING, 'Master API key for the gateway',
+         _NO_DEFAULT,
+         CAT_GENERAL, 1, VIS_EXPERT, 'litellm.master_key',
+         {'x-sensitive': True,
+          'x-secret-ref': 'secrets.api_keys.litellm_master'}),
+        ('DATABASE_URL', T_STRING, 'Postgres connection string',
+         'postgresql://litellm@litellm-postgres:5432/litellm',
+         CAT_GENERAL, 2, VIS_EXPERT, 'litellm.database_url',
+         {'x-requires-field': 'litellm_postgres.infrastructure.container_name'}),
+        ('LITELLM_DROP_PARAMS', T_BOOLEAN, 'Drop unsupported params instead of erroring',
+         True,
+         CAT_GENERAL, 3, VIS_ADVANCED, 'litellm.drop_params', None),
+    )
+
+    _COMFYUI_PROPS = (
+        ('COMFYUI_FLAGS', T_STRING, 'Extra launch flags for the ComfyUI server',
+         '',
+         CAT_GENERAL, 1, VIS_EXPERT, 'comfyui.flags', None),
+    )
+
+    _SEARXNG_PROPS = (
+        ('SEARXNG_BASE_URL', T_STRING, 'Public base URL of the search instance',
+         'http://searxng:8080',
+         CAT_GENERAL, 1, VIS_ADVANCED, 'searxng.base_url', None),
+    )
+
+    def _resolve_path(self, dotted: str):
+        """Walk a dotted path over the blueprint; None when any hop is absent"""
+        obj = self.blueprint
+        for part in dotted.split('.'):
+            get = getattr(obj, 'get', None)
+            if get is None:
+                return None
+            obj = get(part)
+            if obj is None:
+                return None
+        return obj
+
+    def _build_props(self, schema) -> dict:
+        """Materialize a configuration schema from a property table.
+
+        The template_path column doubles as the source path for each
+        field's default, so every entry is built by the same loop with one
+        blueprint walk per field instead of a hand-written dict literal.
+        """
+        properties = {}
+        for (field_name, field_type, description, fallback,
+             category, order, visibility, template_path, extras) in schema:
+            entry = {
+                'type': field_type,
+                'description': description,
+            }
+            if fallback is not _NO_DEFAULT:
+                value = self._resolve_path(template_path)
+                entry['default'] = fallback if value is None else value
+            entry['x-env-var'] = field_name
+            entry['x-category'] = category
+            entry['x-display-order'] = order
+            entry['x-visibility'] = visibility
+            entry['x-template-path'] = template_path
+            if extras:
+                entry.update(extras)
+            properties[field_name] = entry
+        return {'type': 'object', 'properties': properties}
+
+    def _migrate_openwebui_config(self) -> dict:
+        """Migrate openwebui.{general,features,providers} sections"""
+        return self._build_props(self._OPENWEBUI_PROPS)
+
+    def _migrate_litellm_config(self) -> dict:
+        """Migrate the litellm section"""
+        return self._build_props(self._LITELLM_PROPS)
+
+    def _migrate_comfyui_config(self) -> dict:
+        """Migrate the comfyui section"""
+        return self._build_props(self._COMFYUI_PROPS)
+
+    def _migrate_searxng_config(self) -> dict:
+        """Migrate the searxng section"""
+        return self._build_props(self._SEARXNG_PROPS)
+
+
+_USAGE = """\
+usage: migrate_blueprint.py [-h] [--output OUTPUT] [--fast-parse] blueprint
+
+Migrate blueprint-config.json to the topology schema
+
+positional arguments:
+  blueprint            Path to blueprint-config.json
+
+options:
+  -h, --help           show this help message and exit
+  --output, -o OUTPUT  Path for the migrated topology document
+                       (default: topology.json)
+  --fast-parse         Parse the blueprint lazily with cysimdjson
+                       (falls back to a standard parse if unavailable)
+  --compact            Emit compact JSON (default when stdout is not a TTY)
+  --pretty             Emit indented JSON (default when stdout is a TTY)
+"""
+
+
+def _parse_args(argv):
+    """Hand-rolled argument parsing.
+
+    For a one-shot CLI, importing and constructing an ArgumentParser
+    dominates cold-start; the option surface here is small enough to walk
+    sys.argv directly.
+    """
+    blueprint = None
+    output = 'topology.json'
+    fast_parse = False
+    # Humans at a terminal get indented output; piped/CI runs default to
+    # the ~3x-cheaper compact encoding unless --pretty insists.
+    pretty = sys.stdout.isatty()
+
+    args = iter(argv)
+    for arg in args:
+        if arg in ('-h', '--help'):
+            sys.stdout.write(_USAGE)
+            sys.exit(0)
+        elif arg == '--fast-parse':
+            fast_parse = True
+        elif arg == '--compact':
+            pretty = False
+        elif arg == '--pretty':
+            pretty = True
+        elif arg in ('--output', '-o'):
+            output = next(args, None)
+            if output is None:
+                sys.exit('error: argument --output/-o: expected one argument')
+        elif arg.startswith('--output='):
+            output = arg.partition('=')[2]
+        elif arg.startswith('-') and arg != '-':
+            sys.exit(f'error: unrecognized argument: {arg}')
+        elif blueprint is None:
+            blueprint = arg
+        else:
+            sys.exit(f'error: unexpected argument: {arg}')
+
+    if blueprint is None:
+        sys.stderr.write(_USAGE)
+        sys.exit('error: the blueprint path is required')
+    return blueprint, output, fast_parse, pretty
+
+
+def main():
+    blueprint_path, output, fast_parse, pretty = _parse_args(sys.argv[1:])
+
+    try:
+        # Map the file instead of read()ing it: the parser consumes a view
+        # of the page cache directly, skipping the intermediate bytes copy.
+        with open(blueprint_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    blueprint = _load_blueprint(view, fast_parse)
+                finally:
+                    view.release()
+    except (OSError, ValueError) as e:
+        print(f"❌ Failed to load blueprint: {e}")
+        sys.exit(1)
+
+    migrator = BlueprintMigrator(blueprint)
+    with open(output, 'wb', buffering=65536) as f:
+        service_count = migrator.migrate_to(f, pretty=pretty)
+
+    print(f"✅ Migrated {service_count} services to {output}")
+
+
+if __name__ == '__main__':
+    main()
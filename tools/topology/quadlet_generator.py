@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Generate Podman Quadlet units from a topology document.
+
+Runnable counterpart to the QuadletGenerator reference implementation in
+njk-schema-markdown/IMPLEMENTATION-GUIDE.md. Reads topology.json, computes
+the set of enabled services, orders them by dependency, and writes one
+.container file per service (plus .volume and .network units) into the
+output directory.
+
+Usage:
+    python tools/topology/quadlet_generator.py njk-schema-markdown/topology.json --output ./quadlets
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Static skeleton of a .container unit; the optional blocks are pre-joined
+# strings (each line carrying its own leading newline) so one format_map
+# call builds the whole file.
+_CONTAINER_TMPL = """[Unit]
+Description={description}
+After=network-online.target {network}.service
+Requires={network}.service{wants}
+
+[Container]
+Image={image}
+ContainerName={container_name}
+Network={network}{publish}{volumes}{environment}{healthcheck}
+
+[Service]
+Slice=llm.slice
+TimeoutStartSec=900
+Restart=on-failure
+RestartSec=10
+
+[Install]
+WantedBy=scroll-session.target
+"""
+
+# Per-service definition hashes from the previous run live here, inside the
+# output directory, so each output tree tracks its own staleness.
+_FINGERPRINTS_FILE = '.topology-fingerprints.json'
+
+
+def _load_topology(path) -> dict:
+    """Parse a topology document, using orjson's C parser when available.
+
+    Raises OSError on read failures and ValueError (which both
+    json.JSONDecodeError and orjson.JSONDecodeError subclass) on malformed
+    input.
+    """
+    raw = Path(path).read_bytes()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _write_if_changed(path: Path, content: str) -> bool:
+    """Write content to path only when it differs from what is on disk.
+
+    Skipping identical rewrites keeps warm regenerations cheap and avoids
+    touching inodes, which would otherwise trigger systemd daemon-reloads
+    for unchanged units.
+    """
+    data = content.encode('utf-8')
+    if path.exists():
+        try:
+            if hashlib.sha256(path.read_bytes()).digest() == hashlib.sha256(data).digest():
+                return False
+        except OSError:
+            pass
+    path.write_bytes(data)
+    return True
+
+
+class QuadletGenerator:
+    """Generate Podman Quadlet units from a topology document"""
+
+    def __init__(self, topology):
+        self.topology = topology
+        self.services = topology['topology']['services']
+        self.network = topology['topology'].get('network', {})
+        # Conditions resolve against configuration defaults, which do not
+        # change during a run, so results can be cached by raw string.
+        self._cond_cache: Dict[str, bool] = {}
+        # Denormalize the two-level service lookups once; every later pass
+        # reads these instead of re-walking the service dicts.
+        self._infra = {name: svc['infrastructure'] for name, svc in self.services.items()}
+        self._props = {
+            name: svc.get('configuration', {}).get('properties', {})
+            for name, svc in self.services.items()
+        }
+        # Environment lines derive only from configuration defaults; compute
+        # them once per service instead of rescanning properties per write.
+        self._env_vars: Dict[str, List[Tuple[str, str]]] = {}
+        for name, props in self._props.items():
+            pairs = []
+            for field_def in props.values():
+                env_var = field_def.get('x-env-var')
+                default = field_def.get('default')
+                if not env_var or default is None:
+                    continue
+                if isinstance(default, bool):
+                    default = 'true' if default else 'false'
+                pairs.append((env_var, default))
+            self._env_vars[name] = pairs
+        # Progress messages accumulate here and flush as one stdout write
+        # at the end of generate_all, instead of one flushed print per file.
+        self._log: List[str] = []
+        # Content fingerprints drive incremental regeneration: a service
+        # whose definition hash matches the one persisted by the previous
+        # run (and whose output files still exist) is skipped outright.
+        self._fingerprints = {
+            name: hashlib.sha256(
+                json.dumps(svc, sort_keys=True, default=str).encode()
+            ).hexdigest()
+            for name, svc in self.services.items()
+        }
+        self._old_fingerprints: Dict[str, str] = {}
+
+    # Service enablement
+
+    def _evaluate_condition(self, condition: str) -> bool:
+        """Evaluate an enabled_by condition against configuration defaults"""
+        cached = self._cond_cache.get(condition)
+        if cached is not None:
+            return cached
+
+        result = self._evaluate_condition_uncached(condition)
+        self._cond_cache[condition] = result
+        return result
+
+    def _evaluate_condition_uncached(self, condition: str) -> bool:
+        # The grammar is fixed (service.configuration.FIELD <op> value), so
+        # plain string scans beat spinning up the regex engine per condition.
+        if '==' in condition:
+            lhs, _, rhs = condition.partition('==')
+            op = '=='
+        elif '!=' in condition:
+            lhs, _, rhs = condition.partition('!=')
+            op = '!='
+        else:
+            return False
+
+        parts = lhs.strip().split('.')
+        if len(parts) != 3 or parts[1] != 'configuration':
+            return False
+        service_name, _, field_name = parts
+        expected = rhs
+
+        props = self._props.get(service_name)
+        if not props:
+            return False
+
+        field_def = props.get(field_name)
+        if not field_def:
+            return False
+
+        actual = field_def.get('default')
+
+        expected = expected.strip()
+        if expected in ('true', 'false'):
+            expected = expected == 'true'
+        elif expected[:1] in ("'", '"') and expected[-1:] == expected[:1]:
+            expected = expected[1:-1]
+
+        if op == '==':
+            return actual == expected
+        return actual != expected
+
+    def get_enabled_services(self) -> Set[str]:
+        """Return the set of services that should be running"""
+        enabled = set()
+
+        for service_name, infra in self._infra.items():
+            # Unconditionally enabled
+            if infra.get('enabled', False):
+                enabled.add(service_name)
+                continue
+
+            # Conditionally enabled (logical OR)
+            for condition in infra.get('enabled_by', []):
+                if self._evaluate_condition(condition):
+                    enabled.add(service_name)
+                    break
+
+        return enabled
+
+    def topological_sort(self, enabled_services: Set[str]) -> List[str]:
+        """Return services in dependency order (dependencies first)"""
+        graph = {s: [] for s in enabled_services}
+        in_degree = dict.fromkeys(enabled_services, 0)
+
+        for service_name in enabled_services:
+            for dep in self._infra[service_name].get('requires', []):
+                if dep in enabled_services:
+                    graph[dep].append(service_name)
+                    in_degree[service_name] += 1
+
+        # Kahn's algorithm
+        queue = deque(s for s, d in in_degree.items() if d == 0)
+        sorted_services = []
+
+        while queue:
+            service = queue.popleft()
+            sorted_services.append(service)
+
+            for dependent in graph[service]:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    queue.append(dependent)
+
+        if len(sorted_services) != len(enabled_services):
+            raise ValueError("Circular dependency detected")
+
+        return sorted_services
+
+    # File generation
+
+    def generate_all(self, output_dir):
+        """Generate quadlet units for all enabled services"""
+        output_path = Path(output_dir)
+        # EAFP beats exist_ok=True here: mkdir's exist_ok path re-stats the
+        # target, and on warm reruns the directory already exists.
+        try:
+            output_path.mkdir(parents=True)
+        except FileExistsError:
+            pass
+
+        enabled = self.get_enabled_services()
+        startup_order = self.topological_sort(enabled)
+
+        self._old_fingerprints = self._load_fingerprints(output_path)
+        self.generate_network(output_path)
+
+        # Startup order only matters to systemd at runtime, not to file-write
+        # order, so the per-service writes can overlap on disk.
+        with ThreadPoolExecutor() as ex:
+            list(ex.map(lambda s: self.generate_service(s, output_path), startup_order))
+
+        self._save_fingerprints(output_path, startup_order)
+        sys.stdout.write('Generated:\n  ' + '\n  '.join(self._log) + '\n')
+        return startup_order
+
+    def _load_fingerprints(self, output_path: Path) -> Dict[str, str]:
+        """Read the fingerprints persisted by the previous run, if any"""
+        try:
+            return json.loads((output_path / _FINGERPRINTS_FILE).read_bytes())
+        except (OSError, ValueError):
+            return {}
+
+    def _save_fingerprints(self, output_path: Path, service_names: List[str]):
+        """Persist the fingerprints of every service generated this run"""
+        fingerprints = {name: self._fingerprints[name] for name in service_names}
+        content = json.dumps(fingerprints, indent=2, sort_keys=True) + '\n'
+        _write_if_changed(output_path / _FINGERPRINTS_FILE, content)
+
+    def generate_network(self, output_path: Path):
+        """Generate the .network unit"""
+        name = self.network.get('name', 'llm')
+
+        lines = []
+        lines.append("[Unit]")
+        lines.append(f"Description=Network for {name} services")
+        lines.append("")
+        lines.append("[Network]")
+        lines.append(f"NetworkName={name}")
+        if self.network.get('gateway'):
+            lines.append(f"Gateway={self.network['gateway']}")
+        if self.network.get('subnet'):
+            lines.append(f"Subnet={self.network['subnet']}")
+        lines.append("")
+
+        filename = output_path / f"{name}.network"
+        _write_if_changed(filename, '\n'.join(lines))
+        self._log.append(str(filename))
+
+    def generate_service(self, service_name: str, output_path: Path):
+        """Generate the .container and .volume units for a service"""
+        volumes = self._infra[service_name].get('volumes', [])
+
+        # Unchanged definition with all outputs still on disk: nothing to do.
+        if self._old_fingerprints.get(service_name) == self._fingerprints[service_name]:
+            outputs = [output_path / f"{service_name}.container"]
+            outputs.extend(output_path / v['name'] for v in volumes)
+            if all(p.exists() for p in outputs):
+                return
+
+        self._generate_container_file(service_name, output_path)
+        for volume in volumes:
+            self._generate_volume_file(volume, output_path)
+
+    def _generate_container_file(self, service_name, output_path):
+        """Generate the .container unit for a service"""
+        infra = self._infra[service_name]
+        network = infra.get('network', 'llm.network')
+
+        requires = infra.get('requires', [])
+        wants = ''
+        if requires:
+            wants = '\nWants=' + ' '.join(f"{r}.service" for r in requires)
+
+        publish = ''
+        published_port = infra.get('published_port')
+        if published_port:
+            bind = infra.get('bind', '0.0.0.0')
+            publish = f"\nPublishPort={bind}:{published_port}:{infra['port']}"
+
+        volumes = ''.join(
+            f"\nVolume={v['name']}:{v['mount_path']}:{v.get('selinux_label', 'Z')}"
+            for v in infra.get('volumes', [])
+        )
+
+        environment = ''.join(
+            f"\nEnvironment={env_var}={value}"
+            for env_var, value in self._env_vars[service_name]
+        )
+
+        healthcheck = ''
+        hc = infra.get('healthcheck')
+        if hc:
+            healthcheck = (
+                f"\nHealthCmd={hc['cmd']}"
+                f"\nHealthInterval={hc.get('interval', '30s')}"
+                f"\nHealthTimeout={hc.get('timeout', '5s')}"
+                f"\nHealthRetries={hc.get('retries', 3)}"
+                f"\nHealthStartPeriod={hc.get('start_period', '10s')}"
+            )
+
+        content = _CONTAINER_TMPL.format_map({
+            'description': infra.get('description', service_name),
+            'network': network,
+            'image': infra['image'],
+            'container_name': infra['container_name'],
+            'wants': wants,
+            'publish': publish,
+            'volumes': volumes,
+            'environment': environment,
+            'healthcheck': healthcheck,
+        })
+
+        filename = output_path / f"{service_name}.container"
+        _write_if_changed(filename, content)
+        self._log.append(str(filename))
+
+    def _generate_volume_file(self, volume, output_path):
+        """Generate a .volume unit"""
+        name = volume['name']
+        volume_name = name[:-7] if name.endswith('.volume') else name
+
+        lines = []
+        lines.append("[Volume]")
+        lines.append(f"VolumeName={volume_name}")
+        lines.append("")
+
+        filename = output_path / name
+        _write_if_changed(filename, '\n'.join(lines))
+        self._log.append(str(filename))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generate Podman Quadlet units from a topology document'
+    )
+    parser.add_argument('topology', help='Path to topology.json')
+    parser.add_argument('--output', '-o', default='./quadlets',
+                        help='Output directory for generated units')
+    args = parser.parse_args()
+
+    try:
+        topology = _load_topology(args.topology)
+    except (OSError, ValueError) as e:
+        print(f"❌ Failed to load topology: {e}")
+        sys.exit(1)
+
+    generator = QuadletGenerator(topology)
+    try:
+        startup_order = generator.generate_all(args.output)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print(f"✅ Generated quadlets for {len(startup_order)} services")
+    print(f"Startup order: {' -> '.join(startup_order)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Validate a topology document against the topology JSON Schema.
+
+Structural counterpart to validate_topology.py's semantic checks: this
+tool only asserts that topology.json matches topology-schema.json, so it
+can run first and fail fast before the cross-reference checks bother.
+
+Usage:
+    python tools/topology/schema_validator.py njk-schema-markdown/topology.json
+    python tools/topology/schema_validator.py topology.json --schema my-schema.json
+"""
+
+import argparse
+import json
+import sys
+
+import jsonschema
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Fastest validator backend wins: Rust-backed jsonschema_rs, then
+# fastjsonschema's generated-code validator, then stdlib jsonschema.
+try:
+    import jsonschema_rs
+except ImportError:
+    jsonschema_rs = None
+
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+
+def _load_json(path):
+    """Load a JSON file, through orjson when available"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+class SchemaValidator:
+    """Validate topology documents against a JSON Schema"""
+
+    def __init__(self, schema_path):
+        self.schema_path = schema_path
+        self.schema = _load_json(schema_path)
+        self.errors = []
+        # Compile the schema once; re-compiling per validate call (draft
+        # detection, meta-schema check, ref resolution) dominates when
+        # validating many topology files in a loop.
+        if jsonschema_rs is not None:
+            self._backend = 'jsonschema_rs'
+            self._validator = jsonschema_rs.JSONSchema(self.schema)
+        elif fastjsonschema is not None:
+            self._backend = 'fastjsonschema'
+            self._validator = fastjsonschema.compile(self.schema)
+        else:
+            self._backend = 'jsonschema'
+            validator_cls = jsonschema.validators.validator_for(self.schema)
+            validator_cls.check_schema(self.schema)
+            self._validator = validator_cls(self.schema, format_checker=jsonschema.FormatChecker())
+
+    def validate(self, topology) -> bool:
+        """Validate one topology document; collect errors on self.errors"""
+        self.errors = []
+        append = self.errors.append
+        sep = " -> "
+        if self._backend == 'jsonschema_rs':
+            errors = sorted(self._validator.iter_errors(topology),
+                            key=lambda e: tuple(map(str, e.instance_path)))
+            for e in errors:
+                path = sep.join(map(str, e.instance_path)) if e.instance_path else "root"
+                append(f"{path}: {e.message}")
+        elif self._backend == 'fastjsonschema':
+            # fastjsonschema stops at the first error; its path starts
+            # with the synthetic 'data' root.
+            try:
+                self._validator(topology)
+            except fastjsonschema.JsonSchemaException as e:
+                path = sep.join(map(str, e.path[1:])) if e.path[1:] else "root"
+                append(f"{path}: {e.message}")
+        else:
+            # Sort by instance path so error order is stable between runs
+            # (paths mix str and int segments, so compare their str forms).
+            errors = sorted(self._validator.iter_errors(topology),
+                            key=lambda e: tuple(map(str, e.absolute_path)))
+            for e in errors:
+                path = sep.join(map(str, e.absolute_path)) if e.absolute_path else "root"
+                append(f"{path}: {e.message}")
+        return not self.errors
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Validate a topology document against the topology JSON Schema'
+    )
+    parser.add_argument('topology', help='Path to topology.json')
+    parser.add_argument('--schema', '-s', default='njk-schema-markdown/topology-schema.json',
+                        help='Path to the topology JSON Schema')
+    args = parser.parse_args()
+
+    try:
+        validator = SchemaValidator(args.schema)
+        topology = _load_json(args.topology)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if validator.validate(topology):
+        print("✅ Topology matches the schema")
+    else:
+        for error in validator.errors:
+            print(f"❌ {error}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
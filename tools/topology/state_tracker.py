@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+"""
+Track configuration state across topology snapshots.
+
+Computes, for every service in topology.json, which configuration fields
+are riding their defaults, which are required but unset, and which carry
+secrets; diffs two snapshots field by field; and renders Markdown reports
+from either. Complements the generators next to it: state answers "what
+is actually configured", the topology answers "what can be".
+
+Usage:
+    python tools/topology/state_tracker.py compute njk-schema-markdown/topology.json
+    python tools/topology/state_tracker.py diff old-state.json new-state.json
+    python tools/topology/state_tracker.py report state.json
+"""
+
+import argparse
+import hashlib
+import json
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from functools import lru_cache
+from io import StringIO
+from pathlib import Path
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+def _hash_service_fields(fields) -> int:
+    """Stable 64-bit content hash of one service's field map"""
+    if orjson is not None:
+        payload = orjson.dumps(
+            fields,
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS,
+            default=_json_default,
+        )
+    else:
+        payload = json.dumps(fields, sort_keys=True, default=_json_default).encode()
+    if xxhash is not None:
+        return xxhash.xxh3_64(payload).intdigest()
+    return int.from_bytes(hashlib.blake2b(payload, digest_size=8).digest(), 'big')
+
+
+# Pins field_def dicts by id so the prototype cache below never sees a
+# recycled id pointing at a different dict.
+_FIELD_DEF_BY_ID = {}
+
+_FIELD_KEYS = ('state', 'value', 'required', 'type', 'sensitive', 'visibility')
+
+
+@dataclass(slots=True)
+class FieldState:
+    """Per-field state; slots keep 50k-field topologies compact in memory"""
+    state: str
+    value: Any
+    required: bool
+    type: str
+    sensitive: bool
+    visibility: str
+    template_path: Optional[str] = None
+    secret_ref: Optional[str] = None
+
+    # Snapshots loaded back from JSON are plain dicts, so the readers use
+    # mapping access; mirror it here to keep in-memory states compatible.
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def as_dict(self) -> dict:
+        d = dict(zip(_FIELD_KEYS, (
+            self.state, self.value, self.required,
+            self.type, self.sensitive, self.visibility,
+        )))
+        if self.template_path is not None:
+            d['template_path'] = self.template_path
+        if self.secret_ref is not None:
+            d['secret_ref'] = self.secret_ref
+        return d
+
+
+def _json_default(obj):
+    """Serialization hook materializing FieldState dicts lazily"""
+    if isinstance(obj, FieldState):
+        return obj.as_dict()
+    raise TypeError(f"not JSON serializable: {type(obj).__name__}")
+
+
+# Below this many services, fork/pickle overhead outweighs the
+# per-service work; compute serially.
+_PARALLEL_THRESHOLD = 64
+
+# Computed states for unchanged topology bytes land here, keyed by
+# content hash, so repeat compute runs are a file copy.
+_CACHE_DIR = Path.home() / '.cache' / 'state_tracker'
+
+# Diff-report fragments, rendered with format_map and joined in bulk.
+_FIELD_CHANGE_TMPL = "- `{name}`:\n{value_line}{state_line}"
+_VALUE_TMPL = "  - Value: `{old}` → `{new}`\n"
+_STATE_TMPL = "  - State: {old} → {new}\n"
+
+
+def _compute_one_service(item):
+    """Worker for the parallel compute path"""
+    service_name, service = item
+    return service_name, StateTracker()._compute_service_state(service_name, service)
+
+
+def _utc_timestamp() -> str:
+    """Current UTC time as an ISO-8601 Z string"""
+    # datetime.utcnow() is deprecated; the aware equivalent just needs
+    # its '+00:00' suffix folded back to 'Z'.
+    return datetime.now(timezone.utc).isoformat(timespec='microseconds').replace('+00:00', 'Z')
+
+
+@lru_cache(maxsize=4096)
+def _field_prototype(def_id, is_required) -> FieldState:
+    """Build the shared field-state prototype for one schema fragment"""
+    field_def = _FIELD_DEF_BY_ID[def_id]
+    default = field_def.get('default')
+    if default is not None:
+        state = 'default'
+    elif is_required:
+        state = 'unset'
+    else:
+        state = 'optional_unset'
+
+    return FieldState(
+        state=state,
+        value=default,
+        required=is_required,
+        type=field_def.get('type', 'unknown'),
+        sensitive=field_def.get('x-sensitive', False),
+        visibility=field_def.get('x-visibility', 'exposed'),
+        template_path=field_def.get('x-template-path') or None,
+        secret_ref=field_def.get('x-secret-ref') or None,
+    )
+
+
+def _load_json(path):
+    """Load a JSON file, through orjson when available"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _dump_json(obj) -> bytes:
+    """Pretty-print a JSON document to bytes, through orjson when available"""
+    if orjson is not None:
+        # PASSTHROUGH_DATACLASS routes FieldState through the default
+        # hook; orjson's native dataclass path would emit every slot.
+        return orjson.dumps(
+            obj,
+            option=(orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS
+                    | orjson.OPT_PASSTHROUGH_DATACLASS),
+            default=_json_default,
+        )
+    return json.dumps(obj, indent=2, sort_keys=True, default=_json_default).encode()
+
+
+class StateTracker:
+    """Compute and compare configuration state for a topology"""
+
+    def __init__(self, topology=None):
+        self.topology = topology or {}
+        self.services = self.topology.get('topology', {}).get('services', {})
+
+    # State computation
+
+    def compute_state(self) -> dict:
+        """Compute the configuration state of every service"""
+        state = {
+            'timestamp': _utc_timestamp(),
+            'services': {},
+        }
+        out = state['services']
+        if len(self.services) >= _PARALLEL_THRESHOLD:
+            # Services are independent; farm them out across cores.
+            with ProcessPoolExecutor() as ex:
+                for service_name, service_state in ex.map(
+                        _compute_one_service, self.services.items(), chunksize=8):
+                    out[service_name] = service_state
+        else:
+            for service_name, service in self.services.items():
+                out[service_name] = self._compute_service_state(service_name, service)
+        # Reports re-sort the service names on every render otherwise.
+        state['_sorted_services'] = sorted(out)
+        return state
+
+    def _compute_service_state(self, service_name, service) -> dict:
+        """Compute per-field state and a summary for one service"""
+        config = service.get('configuration', {})
+        properties = config.get('properties', {})
+        required = set(config.get('required', []))
+
+        fields = {}
+        # One dict lookup per field replaces the if/elif chain on state;
+        # the buckets double as the name lists the report wants, with the
+        # counters falling out as their lengths.
+        by_state = {'default': [], 'configured': [], 'unset': [], 'optional_unset': []}
+
+        for field_name, field_def in properties.items():
+            field_state = self._compute_field_state(field_def, field_name in required)
+            fields[field_name] = field_state
+            by_state[field_state.state].append(field_name)
+
+        service_state = {
+            'fields': fields,
+            'summary': {
+                'total': len(fields),
+                'using_defaults': len(by_state['default']),
+                'configured': len(by_state['configured']),
+                'unset': len(by_state['unset']),
+            },
+            'unset_fields': by_state['unset'],
+            'configured_fields': by_state['configured'],
+        }
+
+        # Content hash lets compare_states skip unchanged services in O(1);
+        # the name list saves diffs from re-deriving key sets (a frozenset
+        # would be ideal but does not survive the JSON round-trip).
+        service_state['_hash'] = _hash_service_fields(fields)
+        service_state['_field_names'] = sorted(fields)
+
+        return service_state
+
+    def _compute_field_state(self, field_def, is_required) -> FieldState:
+        """Classify one field and capture its effective value"""
+        # Field definitions loaded from one document are shared by
+        # reference wherever the schema reuses a fragment, so the cache is
+        # keyed on identity. Pinning the dict keeps its id from being
+        # recycled while the cache entry lives.
+        def_id = id(field_def)
+        _FIELD_DEF_BY_ID[def_id] = field_def
+        return replace(_field_prototype(def_id, is_required))
+
+    # State comparison
+
+    def compare_states(self, old_state, new_state) -> dict:
+        """Diff two state snapshots service by service"""
+        old_services = old_state.get('services', {})
+        new_services = new_state.get('services', {})
+
+        # dict_keys views support set algebra directly; no set() casts.
+        old_keys = old_services.keys()
+        new_keys = new_services.keys()
+
+        diff = {
+            'timestamp': _utc_timestamp(),
+            'added_services': sorted(new_keys - old_keys),
+            'removed_services': sorted(old_keys - new_keys),
+            'changed_services': {},
+        }
+
+        for name in sorted(old_keys & new_keys):
+            old_service = old_services[name]
+            new_service = new_services[name]
+            # Byte-identical services hash equal; skip the field walk.
+            # Snapshots written before hashes existed fall through to it.
+            old_hash = old_service.get('_hash')
+            if old_hash is not None and old_hash == new_service.get('_hash'):
+                continue
+            changes = self._compare_service_states(old_service, new_service)
+            if changes['added_fields'] or changes['removed_fields'] or changes['changed_fields']:
+                diff['changed_services'][name] = changes
+
+        return diff
+
+    def _compare_service_states(self, old_service, new_service) -> dict:
+        """Diff the fields of one service between two snapshots"""
+        old_fields = old_service.get('fields', {})
+        new_fields = new_service.get('fields', {})
+
+        # Build each side's key set once and reuse it for all three set
+        # operations, preferring the name list the snapshot carries.
+        old_names = frozenset(old_service.get('_field_names') or old_fields)
+        new_names = frozenset(new_service.get('_field_names') or new_fields)
+
+        changes = {
+            'added_fields': sorted(new_names - old_names),
+            'removed_fields': sorted(old_names - new_names),
+            'changed_fields': {},
+        }
+
+        # Hot loop on large topologies: bind the lookups once and pull
+        # value/state out of each side exactly once per field.
+        of_get = old_fields.__getitem__
+        nf_get = new_fields.__getitem__
+        changed = changes['changed_fields']
+        for name in old_names & new_names:
+            of = of_get(name)
+            nf = nf_get(name)
+            # Snapshots diffed in memory often share field dicts by
+            # reference; identical objects can't differ.
+            if of is nf:
+                continue
+            ov, os_ = of.get('value'), of.get('state')
+            nv, ns = nf.get('value'), nf.get('state')
+            if ov != nv or os_ != ns:
+                changed[name] = {
+                    'old': {'value': ov, 'state': os_},
+                    'new': {'value': nv, 'state': ns},
+                }
+
+        return changes
+
+    # Reports
+
+    def generate_report(self, state) -> str:
+        """Render a Markdown report for one state snapshot"""
+        buf = StringIO()
+        w = buf.write
+        w("# Configuration State Report\n\n")
+        w(f"Computed: {state.get('timestamp', 'unknown')}\n\n")
+
+        services = state.get('services', {})
+        # One pass over the summaries instead of one sum() scan per total.
+        total_fields = total_defaults = total_configured = total_unset = 0
+        for s in services.values():
+            sm = s['summary']
+            total_fields += sm['total']
+            total_defaults += sm['using_defaults']
+            total_configured += sm['configured']
+            total_unset += sm['unset']
+
+        w("## Summary\n\n")
+        w(f"- **Services**: {len(services)}\n")
+        w(f"- **Fields**: {total_fields}\n")
+        w(f"- **Using defaults**: {total_defaults}\n")
+        w(f"- **Configured**: {total_configured}\n")
+        w(f"- **Required but unset**: {total_unset}\n\n")
+
+        for service_name in state.get('_sorted_services') or sorted(services):
+            service_state = services[service_name]
+            summary = service_state['summary']
+            w(f"## {service_name}\n\n")
+            w(f"- Total fields: {summary['total']}\n")
+            w(f"- Using defaults: {summary['using_defaults']}\n")
+            w(f"- Required but unset: {summary['unset']}\n")
+
+            # Computed alongside the summary; re-scan only for snapshots
+            # written before the lists existed.
+            unset_fields = service_state.get('unset_fields')
+            if unset_fields is None:
+                unset_fields = [n for n, f in service_state['fields'].items()
+                                if f['state'] == 'unset']
+            configured_fields = service_state.get('configured_fields')
+            if configured_fields is None:
+                configured_fields = [n for n, f in service_state['fields'].items()
+                                     if f['state'] == 'configured']
+            if unset_fields:
+                w(f"- Unset: {', '.join(sorted(unset_fields))}\n")
+            if configured_fields:
+                w(f"- Configured: {', '.join(sorted(configured_fields))}\n")
+            w("\n")
+
+        return buf.getvalue()
+
+    def generate_diff_report(self, diff) -> str:
+        """Render a Markdown report for a state diff"""
+        buf = StringIO()
+        w = buf.write
+        w("# Configuration Diff Report\n\n")
+        w(f"Computed: {diff.get('timestamp', 'unknown')}\n\n")
+
+        if diff['added_services']:
+            w("## Added services\n\n")
+            for name in diff['added_services']:
+                w(f"- `{name}`\n")
+            w("\n")
+
+        if diff['removed_services']:
+            w("## Removed services\n\n")
+            for name in diff['removed_services']:
+                w(f"- `{name}`\n")
+            w("\n")
+
+        if diff['changed_services']:
+            w("## Changed services\n\n")
+            for service_name, changes in diff['changed_services'].items():
+                w(f"### {service_name}\n\n")
+                for field_name in changes['added_fields']:
+                    w(f"- Added field `{field_name}`\n")
+                for field_name in changes['removed_fields']:
+                    w(f"- Removed field `{field_name}`\n")
+                field_parts = []
+                for field_name, change in sorted(changes['changed_fields'].items()):
+                    old, new = change['old'], change['new']
+                    value_line = _VALUE_TMPL.format_map(
+                        {'old': old['value'], 'new': new['value']}
+                    ) if old['value'] != new['value'] else ''
+                    state_line = _STATE_TMPL.format_map(
+                        {'old': old['state'], 'new': new['state']}
+                    ) if old['state'] != new['state'] else ''
+                    field_parts.append(_FIELD_CHANGE_TMPL.format_map({
+                        'name': field_name,
+                        'value_line': value_line,
+                        'state_line': state_line,
+                    }))
+                w(''.join(field_parts))
+                w("\n")
+
+        if not (diff['added_services'] or diff['removed_services']
+                or diff['changed_services']):
+            w("No changes.\n")
+
+        return buf.getvalue()
+
+
+def _topology_cache_path(topology_path) -> Path:
+    """Cache file for one topology, keyed by its content hash"""
+    raw = Path(topology_path).read_bytes()
+    if xxhash is not None:
+        digest = xxhash.xxh3_64_hexdigest(raw)
+    else:
+        digest = hashlib.blake2b(raw, digest_size=8).hexdigest()
+    return _CACHE_DIR / f'{digest}.json'
+
+
+def _write_stdout(state, pretty):
+    """Emit a state snapshot on stdout, compact unless asked otherwise"""
+    if pretty:
+        sys.stdout.buffer.write(_dump_json(state) + b'\n')
+        return
+    # Compact by default: indenting costs serializer time only for a
+    # pipe to re-parse it.
+    if orjson is not None:
+        payload = orjson.dumps(state, option=orjson.OPT_PASSTHROUGH_DATACLASS,
+                               default=_json_default)
+    else:
+        payload = json.dumps(state, default=_json_default).encode()
+    sys.stdout.buffer.write(payload + b'\n')
+
+
+def _stream_compute(topology_path, output_path):
+    """Compute state file-to-file, holding one service in memory at a time"""
+    tracker = StateTracker()
+    timestamp = _utc_timestamp()
+    if orjson is not None:
+        def dumps(obj):
+            return orjson.dumps(obj, option=orjson.OPT_PASSTHROUGH_DATACLASS,
+                                default=_json_default)
+    else:
+        def dumps(obj):
+            return json.dumps(obj, default=_json_default).encode()
+    with open(topology_path, 'rb') as src, open(output_path, 'wb') as dst:
+        dst.write(b'{\n  "timestamp": %s,\n  "services": {'
+                  % json.dumps(timestamp).encode())
+        sep = b'\n    '
+        for service_name, service in ijson.kvitems(src, 'topology.services'):
+            service_state = tracker._compute_service_state(service_name, service)
+            dst.write(sep + json.dumps(service_name).encode() + b': '
+                      + dumps(service_state))
+            sep = b',\n    '
+        dst.write(b'\n  }\n}\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Track configuration state across topology snapshots'
+    )
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_compute = sub.add_parser('compute', help='Compute state from a topology document')
+    p_compute.add_argument('topology', help='Path to topology.json')
+    p_compute.add_argument('--output', '-o',
+                           help='Write state JSON to a file instead of stdout')
+    p_compute.add_argument('--pretty', '-p', action='store_true',
+                           help='Indent stdout output (piped consumers like jq '
+                                'are faster on compact JSON)')
+    p_compute.add_argument('--no-cache', action='store_true',
+                           help='Recompute even if a cached state exists for '
+                                'these topology bytes')
+
+    p_diff = sub.add_parser('diff', help='Diff two state snapshots')
+    p_diff.add_argument('old', help='Path to the older state JSON')
+    p_diff.add_argument('new', help='Path to the newer state JSON')
+    p_diff.add_argument('--report', action='store_true',
+                        help='Render a Markdown report instead of JSON')
+
+    p_report = sub.add_parser('report', help='Render a Markdown report from a state snapshot')
+    p_report.add_argument('state', help='Path to a state JSON')
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'compute':
+            cache_path = None
+            if not args.no_cache:
+                cache_path = _topology_cache_path(args.topology)
+                if cache_path.is_file():
+                    # Same topology bytes, same state (modulo timestamp).
+                    if args.output:
+                        shutil.copyfile(cache_path, args.output)
+                        print(f"✅ State written to {args.output}")
+                    else:
+                        _write_stdout(_load_json(cache_path), args.pretty)
+                    return
+
+            if args.output and ijson is not None:
+                # File-to-file runs never need the whole topology in
+                # memory; stream services through one at a time.
+                _stream_compute(args.topology, args.output)
+                if cache_path is not None:
+                    try:
+                        _CACHE_DIR.mkdir(parents=True)
+                    except FileExistsError:
+                        pass
+                    shutil.copyfile(args.output, cache_path)
+                print(f"✅ State written to {args.output}")
+                return
+
+            topology = _load_json(args.topology)
+            tracker = StateTracker(topology)
+            state = tracker.compute_state()
+            if cache_path is not None:
+                try:
+                    _CACHE_DIR.mkdir(parents=True)
+                except FileExistsError:
+                    pass
+                cache_path.write_bytes(_dump_json(state))
+            if args.output:
+                with open(args.output, 'wb') as f:
+                    f.write(_dump_json(state))
+                print(f"✅ State written to {args.output}")
+            else:
+                _write_stdout(state, args.pretty)
+
+        elif args.command == 'diff':
+            old_state = _load_json(args.old)
+            new_state = _load_json(args.new)
+            tracker = StateTracker()
+            diff = tracker.compare_states(old_state, new_state)
+            if args.report:
+                print(tracker.generate_diff_report(diff))
+            else:
+                sys.stdout.buffer.write(_dump_json(diff) + b'\n')
+
+        elif args.command == 'report':
+            state = _load_json(args.state)
+            tracker = StateTracker()
+            print(tracker.generate_report(state))
+
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
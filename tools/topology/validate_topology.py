@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+"""
+Semantic validation for topology.json.
+
+Validates what the JSON Schema cannot express: dependencies resolve,
+ports and container names are unique, enablement expressions reference
+real fields, secret references point into the secrets tree, and the
+dependency graph is acyclic. Run schema_validator.py first for the
+structural checks; this tool assumes a well-shaped document.
+
+Usage:
+    python tools/topology/validate_topology.py njk-schema-markdown/topology.json
+    python tools/topology/validate_topology.py topology.json --summary
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import deque
+from functools import cached_property
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _load_json(path):
+    """Load a JSON file, through orjson when available"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+# Enablement expressions have a fixed grammar:
+#   "service.configuration.FIELD == value"  (or !=)
+# The strict regex form, used only when strict expression checking is
+# requested; the default path is plain string scanning below. ASCII
+# mode keeps \w off the Unicode property tables, and fullmatch anchors
+# both ends without ^/$ bookkeeping.
+_EXPR_RE = re.compile(r'(\w+)\.configuration\.(\w+)\s*(==|!=)\s*(.+)', re.ASCII)
+
+_CONFIG_SEG = 'configuration.'
+
+# Findings are stored as (code, args) tuples and only rendered to text
+# when someone reads .errors/.warnings or prints results; programmatic
+# callers that just check counts never pay for string formatting.
+_FORMATTERS = {
+    'sensitive_no_secret':
+        lambda s, f: f"{s}.{f}: Sensitive field lacks x-secret-ref",
+    'enables_missing':
+        lambda s, f, target: f"{s}.{f}: Enables non-existent service '{target}'",
+    'affects_missing':
+        lambda s, f, provider, target: (
+            f"{s}.{f}: Provider '{provider}' affects non-existent service '{target}'"),
+    'no_healthcheck':
+        lambda s: f"{s}: Enabled service lacks healthcheck",
+    'port_conflict':
+        lambda port, services: f"Port conflict: Port {port} used by {', '.join(services)}",
+    'name_conflict':
+        lambda name, services: (
+            f"Container name conflict: '{name}' used by {', '.join(services)}"),
+    'missing_dep':
+        lambda s, dep: f"{s}: Requires non-existent service '{dep}'",
+    'cycle':
+        lambda path: "Circular dependency: " + ' -> '.join(path),
+    'invalid_expr':
+        lambda s, expr: f"{s}: Invalid expression '{expr}'",
+    'expr_missing_service':
+        lambda s, ref: f"{s}: Expression references non-existent service '{ref}'",
+    'expr_missing_field':
+        lambda s, ref_s, ref_f: (
+            f"{s}: Expression references non-existent field '{ref_s}.{ref_f}'"),
+    'invalid_ref':
+        lambda s, f, ref: f"{s}.{f}: Invalid reference '{ref}'",
+    'ref_missing_service':
+        lambda s, f, target: f"{s}.{f}: References non-existent service '{target}'",
+    'ref_unresolved':
+        lambda s, f, ref, seg: (
+            f"{s}.{f}: Reference '{ref}' does not resolve (missing '{seg}')"),
+    'secret_bad_prefix':
+        lambda s, f: f"{s}.{f}: Secret reference must start with 'secrets.'",
+    'secret_missing':
+        lambda s, f, ref: f"{s}.{f}: Secret '{ref}' does not exist",
+    'provider_unmodeled':
+        lambda s, f, provider, field: (
+            f"{s}.{f}: Provider '{provider}' expects unmodeled field '{field}'"),
+    'field_unmodeled':
+        lambda s, f, field: f"{s}.{f}: Expects unmodeled field '{field}'",
+}
+
+
+def _parse_expression(expression):
+    """Parse 'service.configuration.FIELD op value' with plain string scans
+
+    The grammar is fixed enough that two partitions and a find beat the
+    regex engine; returns (service, field) or None.
+    """
+    service, sep, rest = expression.partition('.')
+    if not sep or not service or not rest.startswith(_CONFIG_SEG):
+        return None
+    rest = rest[len(_CONFIG_SEG):]
+    idx = rest.find('==')
+    if idx < 0:
+        idx = rest.find('!=')
+    if idx < 0:
+        return None
+    field = rest[:idx].strip()
+    value = rest[idx + 2:].strip()
+    if not field or not value:
+        return None
+    return service, field
+
+
+class TopologyValidator:
+    """Validates topology at field, service, and topology levels"""
+
+    def __init__(self, topology, strict_expressions=False):
+        self.topology = topology
+        self._raw_errors = []
+        self._raw_warnings = []
+        self.strict_expressions = strict_expressions
+
+        # Many fields point at the same x-requires-field target; classify
+        # each distinct reference once.
+        self._ref_cache = {}
+
+    # Derived indexes. Lazy and cached: library callers that only touch
+    # one validation level never pay for the rest, and repeated
+    # validate() calls reuse them. Call invalidate() after mutating the
+    # topology.
+
+    @cached_property
+    def services(self):
+        """Service dicts keyed by interned name
+
+        Interning pays off because the names recur as dict keys, set
+        members, and comparison targets all over the pass; repeated
+        string hashes collapse to pointer comparisons.
+        """
+        return {
+            sys.intern(name): svc
+            for name, svc in self.topology.get('topology', {}).get('services', {}).items()
+        }
+
+    @cached_property
+    def _svc_set(self):
+        """Service names as a frozenset for the bare existence tests"""
+        return frozenset(self.services)
+
+    @cached_property
+    def _infra(self):
+        """Per-service infrastructure dicts, denormalized once"""
+        return {
+            name: svc.get('infrastructure', {}) for name, svc in self.services.items()
+        }
+
+    @cached_property
+    def _props(self):
+        """Per-service configuration properties, denormalized once"""
+        return {
+            name: svc.get('configuration', {}).get('properties', {})
+            for name, svc in self.services.items()
+        }
+
+    @cached_property
+    def _nonempty_props(self):
+        """Services with configured fields; pure proxies are common and
+        the field-level walk iterates only the non-empty ones"""
+        return {name: props for name, props in self._props.items() if props}
+
+    @cached_property
+    def _adj(self):
+        """Dependency edges, shared by the existence check and the cycle
+        sweep; edge targets interned to match the service-name keys"""
+        return {
+            name: [sys.intern(dep) for dep in infra.get('requires', ())]
+            for name, infra in self._infra.items()
+        }
+
+    @cached_property
+    def _secret_paths(self):
+        """Every valid dotted path into the secrets tree, so secret refs
+        check with one hash lookup instead of a per-segment walk"""
+        paths = set()
+        self._flatten_secrets('secrets', self.topology.get('secrets', {}), paths)
+        return paths
+
+    def _flatten_secrets(self, prefix, obj, paths):
+        """Collect every dotted path in the secrets tree"""
+        for key, value in obj.items():
+            path = f'{prefix}.{key}'
+            paths.add(path)
+            if isinstance(value, dict):
+                self._flatten_secrets(path, value, paths)
+
+    def invalidate(self):
+        """Drop the derived indexes after the topology has been mutated"""
+        for name in ('services', '_svc_set', '_infra', '_props',
+                     '_nonempty_props', '_adj', '_secret_paths'):
+            self.__dict__.pop(name, None)
+        self._ref_cache.clear()
+
+    def validate(self) -> bool:
+        """Run all validation levels"""
+        self._raw_errors = []
+        self._raw_warnings = []
+        self.validate_field_level()
+        self.validate_service_level()
+        self.validate_topology_level()
+        return not self._raw_errors
+
+    def _err(self, code, *args):
+        self._raw_errors.append((code, args))
+
+    def _warn(self, code, *args):
+        self._raw_warnings.append((code, args))
+
+    @property
+    def errors(self):
+        """Collected errors, formatted on demand"""
+        return [_FORMATTERS[code](*args) for code, args in self._raw_errors]
+
+    @property
+    def warnings(self):
+        """Collected warnings, formatted on demand"""
+        return [_FORMATTERS[code](*args) for code, args in self._raw_warnings]
+
+    # Field level
+
+    def _iter_fields(self):
+        """Yield (service, field, definition) across every service"""
+        for service_name, properties in self._nonempty_props.items():
+            for field_name, field_def in properties.items():
+                yield service_name, field_name, field_def
+
+    def validate_field_level(self):
+        """Validate field definitions and x-* cross-references in one pass
+
+        Fused: the sensitive, requires-field, secret-ref, provider, and
+        enablement checks all dispatch from a single walk of the field
+        space instead of one nested loop each.
+        """
+        for service_name, field_name, field_def in self._iter_fields():
+            get = field_def.get
+
+            if get('x-sensitive', False) and not get('x-secret-ref'):
+                self._warn('sensitive_no_secret', service_name, field_name)
+
+            reference = get('x-requires-field')
+            if reference:
+                self._validate_field_reference(service_name, field_name, reference)
+
+            secret_ref = get('x-secret-ref')
+            if secret_ref:
+                self._validate_secret_reference(service_name, field_name, secret_ref)
+
+            provider_fields = get('x-provider-fields')
+            if provider_fields:
+                self._validate_provider_fields(service_name, field_name, provider_fields)
+
+            for enabled_service in get('x-enables-services', ()):
+                if sys.intern(enabled_service) not in self._svc_set:
+                    self._err('enables_missing', service_name, field_name,
+                              enabled_service)
+
+            affects = get('x-affects-services')
+            if isinstance(affects, dict):
+                for provider, affected in affects.items():
+                    if affected and sys.intern(affected) not in self._svc_set:
+                        self._err('affects_missing', service_name, field_name,
+                                  provider, affected)
+
+    # Service level
+
+    def validate_service_level(self):
+        """Validate individual services in a single walk
+
+        The healthcheck, port-uniqueness, and container-name checks all
+        read the same infrastructure dicts, so one loop pulls each value
+        into a local once instead of three loops hashing the same keys.
+        Tuple defaults avoid allocating a fresh empty list per service.
+        """
+        # First-seen dicts; a list only materializes on an actual clash,
+        # not for every distinct port or name.
+        ports_seen = {}
+        port_conflicts = {}
+        names_seen = {}
+        name_conflicts = {}
+        for service_name, infra in self._infra.items():
+            get = infra.get
+            enabled = get('enabled') or bool(get('enabled_by'))
+            if enabled and not get('healthcheck'):
+                self._warn('no_healthcheck', service_name)
+
+            published = get('published_port')
+            if published is not None:
+                prev = ports_seen.get(published)
+                if prev is None:
+                    ports_seen[published] = service_name
+                else:
+                    port_conflicts.setdefault(published, [prev]).append(service_name)
+
+            container_name = get('container_name')
+            if container_name:
+                prev = names_seen.get(container_name)
+                if prev is None:
+                    names_seen[container_name] = service_name
+                else:
+                    name_conflicts.setdefault(container_name, [prev]).append(service_name)
+
+        for port, services in port_conflicts.items():
+            self._err('port_conflict', port, tuple(services))
+        for container_name, services in name_conflicts.items():
+            self._err('name_conflict', container_name, tuple(services))
+
+    # Topology level
+
+    def validate_topology_level(self):
+        """Validate cross-service relationships"""
+        self._validate_no_circular_dependencies()
+        self._validate_enablement_expressions()
+
+    def _validate_no_circular_dependencies(self):
+        """Detect circular dependencies with an iterative Kahn sweep"""
+        # In-degree per service over the shared dependency edges, plus
+        # the reverse adjacency so resolving a dependency releases its
+        # dependents. Iterative, so deep graphs can't hit the recursion
+        # limit, and no per-edge path copies. Missing edge targets are
+        # reported here — the one pass over the edges serves both checks.
+        indeg = {name: 0 for name in self._adj}
+        rev = {name: [] for name in self._adj}
+        for service_name, requires in self._adj.items():
+            for dep in requires:
+                if dep in indeg:
+                    indeg[service_name] += 1
+                    rev[dep].append(service_name)
+                else:
+                    self._err('missing_dep', service_name, dep)
+
+        queue = deque(n for n, d in indeg.items() if d == 0)
+        while queue:
+            released = queue.popleft()
+            for dependent in rev[released]:
+                indeg[dependent] -= 1
+                if indeg[dependent] == 0:
+                    queue.append(dependent)
+
+        residual = {n for n, d in indeg.items() if d > 0}
+        if not residual:
+            return
+
+        # Everything left sits on or behind a cycle; walk requires edges
+        # inside the residual set until a node repeats to name one.
+        start = min(residual)
+        seen = {}
+        path = []
+        node = start
+        while node not in seen:
+            seen[node] = len(path)
+            path.append(node)
+            node = next(dep for dep in self._adj[node] if dep in residual)
+        cycle = path[seen[node]:] + [node]
+        self._err('cycle', tuple(cycle))
+
+    def _validate_enablement_expressions(self):
+        """Ensure enabled_by conditions reference valid fields"""
+        for service_name, infra in self._infra.items():
+            for expression in infra.get('enabled_by', ()):
+                self._validate_expression(service_name, expression)
+
+    def _validate_expression(self, service_name, expression):
+        """Validate that an expression references a real field"""
+        if self.strict_expressions:
+            match = _EXPR_RE.fullmatch(expression)
+            parsed = (match.group(1), match.group(2)) if match else None
+        else:
+            parsed = _parse_expression(expression)
+
+        if parsed is None:
+            self._err('invalid_expr', service_name, expression)
+            return
+
+        ref_service, ref_field = parsed
+
+        # The parsed slice is a fresh string; intern it so the lookups
+        # below hit the interned keys by identity.
+        ref_service = sys.intern(ref_service)
+        if ref_service not in self._svc_set:
+            self._err('expr_missing_service', service_name, ref_service)
+            return
+
+        if ref_field not in self._props[ref_service]:
+            self._err('expr_missing_field', service_name, ref_service, ref_field)
+
+    def _validate_field_reference(self, service_name, field_name, reference):
+        """Check that a service.section.key reference resolves"""
+        # Classification depends only on the reference; the prefix is
+        # per-call, so format here and cache there.
+        status, detail = self._resolve_reference(reference)
+        if status == 'invalid':
+            self._err('invalid_ref', service_name, field_name, reference)
+        elif status == 'missing_service':
+            self._err('ref_missing_service', service_name, field_name, detail)
+        elif status == 'unresolved':
+            self._warn('ref_unresolved', service_name, field_name, reference, detail)
+
+    def _resolve_reference(self, reference):
+        """Classify one dotted reference, memoized on the reference string"""
+        cached = self._ref_cache.get(reference)
+        if cached is None:
+            cached = self._ref_cache[reference] = self._classify_reference(reference)
+        return cached
+
+    def _classify_reference(self, reference):
+        """Walk one service.section.key reference through the topology"""
+        # Bounded split: valid references are three or four segments, so
+        # cap the list rather than splitting arbitrarily deep input.
+        segments = reference.split('.', 5)
+        if len(segments) < 3:
+            return ('invalid', None)
+
+        ref_service = sys.intern(segments[0])
+        if ref_service not in self._svc_set:
+            return ('missing_service', ref_service)
+
+        # Configuration fields live under properties in the document.
+        walk = segments[1:]
+        if walk[0] == 'configuration':
+            walk = ['configuration', 'properties'] + walk[1:]
+
+        # EAFP: most references resolve, so index directly and let a
+        # miss (or a non-dict midway) raise instead of paying an
+        # isinstance plus a double lookup per segment.
+        obj = self.services[ref_service]
+        try:
+            for seg in walk:
+                obj = obj[seg]
+        except (KeyError, TypeError):
+            return ('unresolved', seg)
+        return ('ok', None)
+
+    def _validate_secret_reference(self, service_name, field_name, reference):
+        """Check that a secrets.* dotted path exists"""
+        if not reference.startswith('secrets.'):
+            self._err('secret_bad_prefix', service_name, field_name)
+            return
+
+        if reference not in self._secret_paths:
+            self._err('secret_missing', service_name, field_name, reference)
+
+    def _validate_provider_fields(self, service_name, field_name, provider_fields):
+        """Ensure x-provider-fields point at fields that exist"""
+        properties = self._props[service_name]
+        # Warnings, not errors: fields for unselected providers are often
+        # supplied at deploy time rather than modeled.
+        if isinstance(provider_fields, dict):
+            # One C-level set difference decides whether anything is
+            # missing; the per-provider loop only runs on a miss.
+            all_required = set().union(*provider_fields.values())
+            missing = all_required - properties.keys()
+            if not missing:
+                return
+            for provider, fields in provider_fields.items():
+                for required_field in fields:
+                    if required_field in missing:
+                        self._warn('provider_unmodeled', service_name, field_name,
+                                   provider, required_field)
+        elif isinstance(provider_fields, list):
+            missing = set(provider_fields) - properties.keys()
+            for required_field in provider_fields:
+                if required_field in missing:
+                    self._warn('field_unmodeled', service_name, field_name,
+                               required_field)
+
+    # Output
+
+    def _print_topology_summary(self):
+        """Print service counts for a quick overview"""
+        total = len(self.services)
+        # One pass with three counters instead of three scans of the
+        # infrastructure dicts.
+        enabled = conditional = published = 0
+        for infra in self._infra.values():
+            enabled += bool(infra.get('enabled'))
+            conditional += bool(infra.get('enabled_by'))
+            published += infra.get('published_port') is not None
+        print(f"Topology: {total} services "
+              f"({enabled} enabled, {conditional} conditional, {published} published)")
+
+    def print_results(self):
+        """Print validation results"""
+        # Counts come from the raw tuples; the errors/warnings
+        # properties format each finding exactly once, here.
+        if self._raw_errors:
+            print("❌ ERRORS:")
+            for error in self.errors:
+                print(f"  • {error}")
+
+        if self._raw_warnings:
+            print("⚠️  WARNINGS:")
+            for warning in self.warnings:
+                print(f"  • {warning}")
+
+        if not self._raw_errors and not self._raw_warnings:
+            print("✅ Validation passed with no errors or warnings")
+        elif not self._raw_errors:
+            print(f"✅ Validation passed with {len(self._raw_warnings)} warnings")
+        else:
+            print(f"❌ Validation failed with {len(self._raw_errors)} errors, "
+                  f"{len(self._raw_warnings)} warnings")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Semantic validation for a topology document'
+    )
+    parser.add_argument('topology', help='Path to topology.json')
+    parser.add_argument('--summary', action='store_true',
+                        help='Print service counts after validating')
+    parser.add_argument('--strict', action='store_true',
+                        help='Parse enablement expressions with the strict regex grammar')
+    args = parser.parse_args()
+
+    try:
+        topology = _load_json(args.topology)
+    except (OSError, ValueError) as e:
+        print(f"❌ Failed to load topology: {e}")
+        sys.exit(1)
+
+    validator = TopologyValidator(topology, strict_expressions=args.strict)
+    valid = validator.validate()
+    validator.print_results()
+    if args.summary:
+        validator._print_topology_summary()
+    sys.exit(0 if valid else 1)
+
+
+if __name__ == '__main__':
+    main()